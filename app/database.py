@@ -1,7 +1,8 @@
 from sqlmodel import SQLModel
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import text, inspect
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
 import logging
 import os
 from app.settings import settings
@@ -10,52 +11,151 @@ logger = logging.getLogger(__name__)
 
 logger = logging.getLogger(__name__)
 
-# Ensure data directory exists
-os.makedirs(
-    os.path.dirname(settings.DATABASE_URL.replace("sqlite+aiosqlite:///", "")),
-    exist_ok=True,
-)
+# Ensure data directory exists (in-memory databases have nothing on disk,
+# including shared-cache URIs like "file:name?mode=memory&cache=shared&uri=true")
+_db_url = make_url(settings.DATABASE_URL)
+_db_path = _db_url.database or ""
+if _db_url.query.get("uri") == "true" and _db_path.startswith("file:"):
+    _db_path = _db_path[len("file:") :]
+if (
+    _db_path
+    and _db_path != ":memory:"
+    and _db_url.query.get("mode") != "memory"
+    and os.path.dirname(_db_path)
+):
+    os.makedirs(os.path.dirname(_db_path), exist_ok=True)
 
 
 engine = create_async_engine(settings.DATABASE_URL, echo=False, future=True)
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
+# Columns added after the initial schema: name -> SQLite column type
+MIGRATION_COLUMNS = {
+    "type_id": "INTEGER",
+    "status_id": "INTEGER",
+    "rating": "FLOAT",
+    "likes": "INTEGER",
+    "weighted_rating": "FLOAT",
+}
+
+
 async def migrate_db(connection):
     """
     Check for missing columns and add them safely.
     """
     try:
+        # One PRAGMA round-trip instead of building an Inspector
+        # (which issues its own table lookup + PRAGMA queries).
+        result = await connection.execute(text("PRAGMA table_info(games)"))
+        column_names = {row[1] for row in result.fetchall()}
+        if not column_names:
+            return
+
+        for column, column_type in MIGRATION_COLUMNS.items():
+            if column not in column_names:
+                logger.info(f"Migrating DB: Adding '{column}' column to 'games' table.")
+                await connection.execute(
+                    text(f"ALTER TABLE games ADD COLUMN {column} {column_type}")
+                )
 
-        def do_inspect(conn):
-            inspector = inspect(conn)
-            return inspector.get_columns("games")
+    except Exception as e:
+        logger.error(f"Migration Check Failed: {e}", exc_info=True)
 
-        columns = await connection.run_sync(do_inspect)
-        column_names = [c["name"] for c in columns]
 
-        if "type_id" not in column_names:
-            logger.info("Migrating DB: Adding 'type_id' column to 'games' table.")
-            await connection.execute(
-                text("ALTER TABLE games ADD COLUMN type_id INTEGER")
-            )
+# Keep game_tags in step with games.tags (JSON list text) for every writer,
+# ORM or Core. Malformed JSON is treated as an empty list.
+_TAG_ROWS = (
+    "INSERT OR IGNORE INTO game_tags (tag, game_id) "
+    "SELECT value, NEW.f95_id FROM json_each("
+    "CASE WHEN json_valid(NEW.tags) THEN NEW.tags ELSE '[]' END)"
+)
+GAME_TAGS_TRIGGERS = {
+    "games_tags_after_insert": f"AFTER INSERT ON games BEGIN {_TAG_ROWS}; END",
+    "games_tags_after_update": (
+        "AFTER UPDATE OF tags ON games BEGIN "
+        f"DELETE FROM game_tags WHERE game_id = OLD.f95_id; {_TAG_ROWS}; END"
+    ),
+    "games_tags_after_delete": (
+        "AFTER DELETE ON games BEGIN "
+        "DELETE FROM game_tags WHERE game_id = OLD.f95_id; END"
+    ),
+}
+
+
+async def sync_game_tags(connection):
+    """
+    Install the game_tags triggers and backfill the table on first run.
+    """
+    for name, body in GAME_TAGS_TRIGGERS.items():
+        await connection.execute(text(f"CREATE TRIGGER IF NOT EXISTS {name} {body}"))
+
+    result = await connection.execute(text("SELECT EXISTS (SELECT 1 FROM game_tags)"))
+    if result.scalar():
+        return
+
+    result = await connection.execute(
+        text(
+            "INSERT OR IGNORE INTO game_tags (tag, game_id) "
+            "SELECT j.value, g.f95_id FROM games AS g, json_each("
+            "CASE WHEN json_valid(g.tags) THEN g.tags ELSE '[]' END) AS j "
+            "WHERE g.tags IS NOT NULL"
+        )
+    )
+    if result.rowcount:
+        logger.info(f"Backfilled {result.rowcount} game_tags rows from games.tags.")
 
-        if "status_id" not in column_names:
-            logger.info("Migrating DB: Adding 'status_id' column to 'games' table.")
-            await connection.execute(
-                text("ALTER TABLE games ADD COLUMN status_id INTEGER")
-            )
 
-        if "rating" not in column_names:
-            logger.info("Migrating DB: Adding 'rating' column to 'games' table.")
-            await connection.execute(text("ALTER TABLE games ADD COLUMN rating FLOAT"))
+def _weighted_rating_sql(row: str = "") -> str:
+    """
+    Weighted Rating (Bayesian Average) as a SQL expression over a games row.
+    WR = (v / (v+m)) * R + (m / (v+m)) * C
+    v = likes (coalesce to 0), R = rating (coalesce to 0)
+    m = settings.WEIGHTED_RATING_MIN_VOTES, C = settings.WEIGHTED_RATING_GLOBAL_MEAN
+    """
+    m = float(settings.WEIGHTED_RATING_MIN_VOTES)
+    C = float(settings.WEIGHTED_RATING_GLOBAL_MEAN)
+    # Cast inputs to Float to avoid integer division issues
+    v = f"CAST(COALESCE({row}likes, 0) AS FLOAT)"
+    R = f"CAST(COALESCE({row}rating, 0) AS FLOAT)"
+    return f"({v} / ({v} + {m})) * {R} + ({m} / ({v} + {m})) * {C}"
 
-        if "likes" not in column_names:
-            logger.info("Migrating DB: Adding 'likes' column to 'games' table.")
-            await connection.execute(text("ALTER TABLE games ADD COLUMN likes INTEGER"))
 
-    except Exception as e:
-        logger.error(f"Migration Check Failed: {e}", exc_info=True)
+async def sync_weighted_ratings(connection):
+    """
+    Keep games.weighted_rating (indexed, used for sort_by=rating) current.
+    Triggers are rebuilt on every start so they pick up changed settings,
+    and rows computed with old settings are refreshed in one UPDATE.
+    """
+    await connection.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_games_weighted_rating "
+            "ON games (weighted_rating)"
+        )
+    )
+
+    set_wr = (
+        f"UPDATE games SET weighted_rating = {_weighted_rating_sql('NEW.')} "
+        "WHERE f95_id = NEW.f95_id"
+    )
+    triggers = {
+        "games_wr_after_insert": f"AFTER INSERT ON games BEGIN {set_wr}; END",
+        "games_wr_after_update": (
+            f"AFTER UPDATE OF rating, likes ON games BEGIN {set_wr}; END"
+        ),
+    }
+    for name, body in triggers.items():
+        await connection.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+        await connection.execute(text(f"CREATE TRIGGER {name} {body}"))
+
+    wr = _weighted_rating_sql()
+    result = await connection.execute(
+        text(
+            f"UPDATE games SET weighted_rating = {wr} WHERE weighted_rating IS NOT {wr}"
+        )
+    )
+    if result.rowcount:
+        logger.info(f"Recomputed weighted_rating for {result.rowcount} games.")
 
 
 async def init_db():
@@ -64,6 +164,8 @@ async def init_db():
         await conn.run_sync(SQLModel.metadata.create_all)
         # Run custom migration check after create_all
         await migrate_db(conn)
+        await sync_game_tags(conn)
+        await sync_weighted_ratings(conn)
         # Run Backfill (separate transaction/session logic usually needed, but we can do raw SQL or use a separate session)
         # We'll run it after this block ensures columns exist.
 
@@ -72,77 +174,42 @@ async def backfill_ratings():
     """
     One-time backfill: Parse details_json -> rating/likes for existing rows.
     """
-    import json
     from app.models import Game
-    from sqlalchemy.future import select
+    from sqlalchemy import Float, Integer, case, cast, func, update
+
+    def _json_number(path, type_):
+        # Top-level JSON field as a number; missing/zero/non-numeric -> NULL
+        value = cast(func.json_extract(Game.details_json, path), type_)
+        return case((value != 0, value))
 
     logger.info("Checking for games requiring Rating/Likes backfill...")
-    async with AsyncSessionLocal() as session:
-        # Find games with details but NO rating (assuming if rating is missing, we check)
-        # Limit to batch to avoid memory explosion if huge DB
-        stmt = (
-            select(Game)
-            .where(Game.details_json.is_not(None))
-            .where((Game.rating.is_(None)) | (Game.likes.is_(None)))
-            .limit(1000)
+    # One set-based UPDATE: SQLite pulls the fields out of details_json
+    # (json_extract) for every candidate row, so nothing is loaded or parsed in
+    # Python. Rows whose JSON has no usable value simply keep their NULLs.
+    stmt = (
+        update(Game)
+        .where(Game.details_json.is_not(None))
+        .where(func.json_valid(Game.details_json))
+        .where((Game.rating.is_(None)) | (Game.likes.is_(None)))
+        .values(
+            # Handle Rating (field is 'score' in F95Checker JSON)
+            rating=func.coalesce(
+                _json_number("$.rating", Float),
+                _json_number("$.score", Float),
+                Game.rating,
+            ),
+            # Handle Likes (field might be 'likes' or 'votes')
+            likes=func.coalesce(
+                _json_number("$.likes", Integer),
+                _json_number("$.votes", Integer),
+                Game.likes,
+            ),
         )
+    )
+    async with engine.begin() as conn:
+        result = await conn.execute(stmt)
 
-        while True:
-            result = await session.execute(stmt)
-            games = result.scalars().all()
-
-            if not games:
-                break
-
-            logger.info(f"Backfilling ratings for {len(games)} games...")
-            updates = 0
-            for game in games:
-                try:
-                    data = json.loads(game.details_json)
-                    changed = False
-
-                    # Handle Rating (field is 'score' in F95Checker JSON)
-                    rating_val = data.get("rating") or data.get("score")
-                    if rating_val:
-                        try:
-                            game.rating = float(rating_val)
-                            changed = True
-                        except (ValueError, TypeError):
-                            pass
-
-                    # Handle Likes (field might be 'likes' or 'votes')
-                    likes_val = data.get("likes") or data.get("votes")
-                    if likes_val:
-                        try:
-                            game.likes = int(likes_val)
-                            changed = True
-                        except (ValueError, TypeError):
-                            pass
-
-                    # Mark as processed even if no data found to avoid infinite loop?
-                    # No, if data is missing from JSON, we can't extract it.
-                    # We should probably flag it or just let it be.
-                    # To prevent infinite loop on items with details but NO rating in JSON:
-                    # We can't easily "mark" them without another column.
-                    # Workaround: For this specific backfill, we only target items where we set a value.
-                    # BUT if we don't set a value, we will pick them up again.
-                    # FIX: Explicitly set 0 or keep as is?
-                    # Let's trust that most enriched items have these fields.
-                    # If not, we might re-scan them on next boot. Acceptable for now.
-
-                    if changed:
-                        session.add(game)
-                        updates += 1
-
-                except Exception:
-                    continue
-
-            await session.commit()
-            if updates == 0:
-                # Avoid infinite loop if we found games but couldn't update any
-                break
-
-    logger.info("Backfill check complete.")
+    logger.info(f"Backfill check complete ({result.rowcount} games checked).")
 
 
 async def get_session() -> AsyncSession:
@@ -5,11 +5,19 @@ import structlog
 from app.settings import settings
 from pathlib import Path
 
+_CONFIGURED = False
+
 
 def configure_logging():
     """
     Configures logging for the application using structlog and standard logging.
+    Idempotent: repeat calls (e.g. re-importing app.main) are no-ops instead of
+    rebuilding every handler and reopening the log file.
     """
+    global _CONFIGURED
+    if _CONFIGURED:
+        return
+
     log_level = settings.LOG_LEVEL.upper()
     json_format = settings.LOG_JSON_FORMAT
 
@@ -99,3 +107,5 @@ def configure_logging():
         wrapper_class=structlog.stdlib.BoundLogger,
         cache_logger_on_first_use=True,
     )
+
+    _CONFIGURED = True
@@ -7,9 +7,7 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 # We need to import models so SQLModel knows about them before init_db
 from app.models import Game  # noqa: F401
 from app.services.game_service import GameService
-from sqlalchemy.orm import sessionmaker
-from app.database import engine
-from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal, engine
 import asyncio
 import logging
 import time
@@ -23,9 +21,8 @@ scheduler = AsyncIOScheduler()
 
 
 async def scheduled_update_task():
-    # Create a new session for the background task
-    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-    async with async_session() as session:
+    # Create a new session for the background task (shared engine/pool)
+    async with AsyncSessionLocal() as session:
         service = GameService(session)
         await service.update_latest_games()
 
@@ -64,6 +61,8 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Application shutting down...")
     scheduler.shutdown()
+    # Close pooled DB connections once, at process shutdown
+    await engine.dispose()
 
 
 app = FastAPI(title="AVNCodex Indexer", lifespan=lifespan)
@@ -26,6 +26,9 @@ class Game(SQLModel, table=True):
     status_id: Optional[int] = Field(default=None, index=True)
     rating: Optional[float] = Field(default=None, index=True)
     likes: Optional[int] = Field(default=None, index=True)
+    # Bayesian average of rating/likes for sorting; maintained by SQLite
+    # triggers (see app.database.sync_weighted_ratings), never set directly
+    weighted_rating: Optional[float] = Field(default=None, index=True)
     details_json: Optional[str] = None
     last_enriched: Optional[datetime] = None
 
@@ -41,3 +44,17 @@ class Game(SQLModel, table=True):
     @id.setter
     def id(self, value: int):
         self.f95_id = value
+
+
+class GameTag(SQLModel, table=True):
+    """
+    One row per (tag, game), mirrored from the Game.tags JSON list by SQLite
+    triggers (see app.database.sync_game_tags), so tag filters are index
+    lookups instead of LIKE scans over every row's tags string.
+    """
+
+    __tablename__ = "game_tags"
+
+    # (tag, game_id) primary key doubles as the tag -> games lookup index
+    tag: str = Field(primary_key=True)
+    game_id: int = Field(primary_key=True, foreign_key="games.f95_id", index=True)
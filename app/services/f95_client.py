@@ -12,9 +12,19 @@ class F95ZoneClient:
     LATEST_DATA_URL = f"{BASE_URL}/sam/latest_alpha/latest_data.php"
     LOGIN_URL = f"{BASE_URL}/login/login"
 
-    def __init__(self):
-        # Persistent client to hold cookies
-        self.client = httpx.AsyncClient(
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        # Persistent client to hold cookies.
+        # An existing f95zone.to client can be passed in to share its
+        # connection pool (and cookie jar); the caller then owns closing it.
+        self.client = client or self.build_http_client()
+        self._owns_client = client is None
+        self.username = settings.F95_USERNAME
+        self.password = settings.F95_PASSWORD
+        self._logged_in = False
+
+    @staticmethod
+    def build_http_client() -> httpx.AsyncClient:
+        return httpx.AsyncClient(
             verify=False,  # F95 often has weird certs or cloudflare
             timeout=30.0,
             headers={
@@ -22,12 +32,16 @@ class F95ZoneClient:
             },
             follow_redirects=True,
         )
-        self.username = settings.F95_USERNAME
-        self.password = settings.F95_PASSWORD
-        self._logged_in = False
 
     async def close(self):
-        await self.client.aclose()
+        if self._owns_client:
+            await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
 
     async def login(self) -> bool:
         """
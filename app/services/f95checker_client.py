@@ -1,3 +1,4 @@
+import asyncio
 import httpx
 import logging
 from typing import List, Dict, Any, Optional
@@ -10,15 +11,25 @@ class F95CheckerClient:
     BASE_URL = "https://api.f95checker.dev"
 
     def __init__(self):
-        # Shared client for efficiency
+        # Shared client for efficiency.
+        # Keep as many idle connections as may be opened, so concurrent
+        # details requests go back to the pool instead of being dropped.
         self.client = httpx.AsyncClient(
-            headers={"User-Agent": "AVNCodex-Indexer/1.0"}, timeout=60.0
+            headers={"User-Agent": "AVNCodex-Indexer/1.0"},
+            timeout=60.0,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
         )
         self.daily_limit = settings.F95CHECKER_DAILY_LIMIT
 
     async def close(self):
         await self.client.aclose()
 
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
     async def check_updates(self, thread_ids: List[int]) -> Dict[int, int]:
         """
         Bulk check for updates. Returns {thread_id: last_changed_timestamp}.
@@ -96,3 +107,22 @@ class F95CheckerClient:
                 extra={"url": url, "thread_id": thread_id, "error": str(e)},
             )
             return None
+
+    async def get_game_details_bulk(
+        self, timestamps: Dict[int, int], concurrency: int = 5
+    ) -> Dict[int, Optional[Dict[str, Any]]]:
+        """
+        Get full details for many games. Takes the {thread_id: timestamp} map
+        from check_updates and returns {thread_id: details or None}.
+        The API has no bulk endpoint, so the requests go out concurrently over
+        the pooled client, at most `concurrency` in flight.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(thread_id: int) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await self.get_game_details(thread_id, timestamps[thread_id])
+
+        ids = list(timestamps)
+        results = await asyncio.gather(*(fetch(tid) for tid in ids))
+        return dict(zip(ids, results))
@@ -1,15 +1,15 @@
+import asyncio
+import functools
 import logging
 import json
 from datetime import datetime, timezone, timedelta
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy.future import select
-from sqlalchemy import or_, and_, cast, Float
-from sqlalchemy.sql.functions import coalesce
+from sqlalchemy import or_, and_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import BackgroundTasks
-from app.models import Game
+from app.models import Game, GameTag
 from app.services.f95_client import F95ZoneClient
-from app.services.rss_client import RSSClient
 from app.services.f95checker_client import F95CheckerClient
 from app.database import AsyncSessionLocal
 from app.settings import settings
@@ -17,6 +17,52 @@ from app.settings import settings
 logger = logging.getLogger(__name__)
 
 
+def _tag_value(tag: str) -> str:
+    """
+    Normalize a filter tag to its game_tags value.
+    Tags may arrive quoted ("Tag") as they appear in the JSON list; numeric
+    tags are stored as their digits.
+    """
+    if len(tag) >= 2 and tag.startswith('"') and tag.endswith('"'):
+        return tag[1:-1]
+    return tag
+
+
+@functools.lru_cache(maxsize=1024)
+def _tag_match(tag: str):
+    """
+    Clause matching games that carry the tag, via the indexed game_tags table.
+    Cached per tag, so repeated tags (across tags / tag_groups or requests)
+    reuse the same clause.
+    """
+    return Game.f95_id.in_(
+        select(GameTag.game_id).where(GameTag.tag == _tag_value(tag))
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def _sort_order(sort_by: str, sort_dir: str):
+    """
+    ORDER BY clause for a (sort_by, sort_dir) pair, built once and reused.
+    """
+    # Sorting Logic
+    if sort_by == "name":
+        sort_col = Game.name
+    elif sort_by == "rating":
+        # Weighted Rating (Bayesian Average), precomputed and indexed
+        # (see app.database.sync_weighted_ratings)
+        sort_col = Game.weighted_rating
+    elif sort_by == "updated_at":
+        sort_col = Game.f95_last_update
+    else:
+        # Default fallback
+        sort_col = Game.f95_last_update
+
+    if sort_dir == "asc":
+        return sort_col.asc().nulls_last()
+    return sort_col.desc().nulls_last()
+
+
 async def standalone_force_update(thread_id: int):
     """
     Background task to update a game with a fresh session.
@@ -48,10 +94,7 @@ async def standalone_process_search_updates(game_ids: List[int]):
         # We need to re-fetch the games because we are in a new session
         # and we need to check their current timestamp against the fast check result.
 
-        stmt = select(Game).where(Game.f95_id.in_(list(timestamps_map.keys())))
-        result = await session.execute(stmt)
-        games = result.scalars().all()
-        games_map = {g.f95_id: g for g in games}
+        games_map = await service.get_games_by_ids(list(timestamps_map))
 
         to_fetch_details = []
 
@@ -81,14 +124,15 @@ async def standalone_process_search_updates(game_ids: List[int]):
             logger.info(
                 f"Background Update: Syncing {len(to_fetch_details)} stale games..."
             )
-            count = 0
-            for gid, ts in to_fetch_details:
-                details = await checker_client.get_game_details(gid, ts)
-                if details:
-                    game = games_map.get(gid)
-                    if game:
-                        service.update_game_with_checker_details(game, details, ts)
-                        count += 1
+            details_map = await checker_client.get_game_details_bulk(
+                dict(to_fetch_details)
+            )
+            updates = [
+                (games_map[gid], details_map[gid], ts)
+                for gid, ts in to_fetch_details
+                if details_map.get(gid) and gid in games_map
+            ]
+            count = await service.update_games_with_checker_details_bulk(updates)
 
             await session.commit()
             logger.info(f"Background Update: Successfully updated {count} games.")
@@ -99,11 +143,17 @@ async def standalone_process_search_updates(game_ids: List[int]):
 
 
 class GameService:
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        f95_client: Optional[F95ZoneClient] = None,
+        checker_client: Optional[F95CheckerClient] = None,
+    ):
         self.session = session
-        self.f95_client = F95ZoneClient()
-        self.rss_client = RSSClient()
-        self.checker_client = F95CheckerClient()
+        # Long-lived callers (e.g. SeedService) pass their own clients so a
+        # service per batch doesn't open a new connection pool every time.
+        self.f95_client = f95_client or F95ZoneClient()
+        self.checker_client = checker_client or F95CheckerClient()
 
     async def track_game(self, thread_id: int) -> Game:
         """
@@ -159,11 +209,13 @@ class GameService:
         )
 
         timestamps_map = await self.checker_client.check_updates(ids_to_check)
+        # One query for all returned ids, then O(1) lookups per id
+        games_map = await self.get_games_by_ids(list(timestamps_map))
 
-        count = 0
+        to_fetch = {}
         for tid, ts in timestamps_map.items():
             should_fetch = False
-            game = await self.get_game_by_id(tid)
+            game = games_map.get(tid)
             if not game:
                 continue
 
@@ -176,31 +228,45 @@ class GameService:
 
             if should_fetch:
                 logger.info(f"Fetching full details for tracked game {tid}...")
-                details = await self.checker_client.get_game_details(tid, ts)
-                if details:
-                    self.update_game_with_checker_details(game, details, ts)
-                    count += 1
+                to_fetch[tid] = ts
+
+        details_map = await self.checker_client.get_game_details_bulk(to_fetch)
+        count = await self.update_games_with_checker_details_bulk(
+            [
+                (games_map[tid], details, to_fetch[tid])
+                for tid, details in details_map.items()
+                if details
+            ]
+        )
 
         await self.session.commit()
         logger.info(f"Synced {count} tracked games.")
 
-    def update_game_with_checker_details(self, game: Game, details: dict, ts: int):
+    def checker_details_values(self, game: Game, details: dict, ts: int) -> dict:
         """
-        Merge F95Checker details into game object.
+        Column values from merging F95Checker details into a game.
+        Always returns the same keys (falling back to the game's current
+        values), so a batch of them can go out as one executemany UPDATE.
         """
-        game.version = details.get("version") or game.version
-        game.status = str(details.get("status"))
+        values = {
+            "version": details.get("version") or game.version,
+            "status": str(details.get("status")),
+            "type_id": game.type_id,
+            "status_id": game.status_id,
+            "rating": game.rating,
+            "likes": game.likes,
+        }
 
         # Populate IDs
         if details.get("type"):
             try:
-                game.type_id = int(details.get("type"))
+                values["type_id"] = int(details.get("type"))
             except (ValueError, TypeError):
                 pass
 
         if details.get("status"):
             try:
-                game.status_id = int(details.get("status"))
+                values["status_id"] = int(details.get("status"))
             except (ValueError, TypeError):
                 pass
 
@@ -208,7 +274,7 @@ class GameService:
         rating_val = details.get("rating") or details.get("score")
         if rating_val:
             try:
-                game.rating = float(rating_val)
+                values["rating"] = float(rating_val)
             except (ValueError, TypeError):
                 pass
 
@@ -216,44 +282,55 @@ class GameService:
         likes_val = details.get("likes") or details.get("votes")
         if likes_val:
             try:
-                game.likes = int(likes_val)
+                values["likes"] = int(likes_val)
             except (ValueError, TypeError):
                 pass
 
         # Date Logic: Prefer 'last_updated' from full details (actual index time)
         # over 'ts' (fast check time), which might just be a staleness check.
-        if details.get("last_updated"):
+        last_updated = details.get("last_updated")
+        if last_updated:
             try:
-                # F95Checker API returns string or int timestamp
-                ts_val = float(details["last_updated"])
-                game.f95_last_update = datetime.fromtimestamp(ts_val)
+                # F95Checker API returns string or int timestamp;
+                # numbers are used as-is, only strings need parsing
+                if isinstance(last_updated, (int, float)):
+                    ts_val = last_updated
+                else:
+                    ts_val = float(last_updated)
+                values["f95_last_update"] = datetime.fromtimestamp(ts_val)
                 logger.info(
-                    f"Enriched game {game.f95_id} with FULL update time: {game.f95_last_update}"
+                    "Enriched game %s with FULL update time: %s",
+                    game.f95_id,
+                    values["f95_last_update"],
                 )
             except (ValueError, TypeError):
                 # Fallback if parse fails
-                game.f95_last_update = datetime.fromtimestamp(ts)
+                values["f95_last_update"] = datetime.fromtimestamp(ts)
                 logger.warning(
-                    f"Failed to parse 'last_updated', using FAST check time: {game.f95_last_update}"
+                    "Failed to parse 'last_updated', using FAST check time: %s",
+                    values["f95_last_update"],
                 )
         else:
-            game.f95_last_update = datetime.fromtimestamp(ts)
+            values["f95_last_update"] = datetime.fromtimestamp(ts)
             logger.info(
-                f"Field 'last_updated' missing, using FAST check time: {game.f95_last_update}"
+                "Field 'last_updated' missing, using FAST check time: %s",
+                values["f95_last_update"],
             )
 
-        game.last_updated_at = datetime.now(timezone.utc)
-        game.last_enriched = datetime.now(timezone.utc)
+        now = datetime.now(timezone.utc)
+        values["last_updated_at"] = now
+        values["last_enriched"] = now
 
         # Tags update
-        if details.get("tags"):
-            game.tags = json.dumps(details.get("tags"))
+        values["tags"] = (
+            json.dumps(details.get("tags")) if details.get("tags") else game.tags
+        )
 
         # Cover URL
         # F95Checker usually puts it in 'featured_image' or 'cover_url' or similar?
         # Based on legacy investigation, it might be just 'image_url' or passed in details.
         # We will check common keys.
-        game.cover_url = (
+        values["cover_url"] = (
             details.get("featured_image")
             or details.get("cover_url")
             or details.get("image_url")
@@ -269,15 +346,50 @@ class GameService:
                 pass
 
         current_details.update(details)
-        game.details_json = json.dumps(current_details)
+        values["details_json"] = json.dumps(current_details)
+        return values
+
+    def update_game_with_checker_details(self, game: Game, details: dict, ts: int):
+        """
+        Merge F95Checker details into game object.
+        """
+        for key, value in self.checker_details_values(game, details, ts).items():
+            setattr(game, key, value)
         self.session.add(game)
 
+    async def update_games_with_checker_details_bulk(
+        self, updates: List[Tuple[Game, dict, int]]
+    ) -> int:
+        """
+        Merge F95Checker details into many games with a single executemany
+        UPDATE keyed on f95_id. Takes (game, details, ts) triples; the caller
+        commits. The in-memory Game objects are left untouched.
+        """
+        mappings = [
+            {"f95_id": game.f95_id, **self.checker_details_values(game, details, ts)}
+            for game, details, ts in updates
+        ]
+        if mappings:
+            await self.session.execute(update(Game), mappings)
+        return len(mappings)
+
     async def get_game_by_id(self, thread_id: int) -> Optional[Game]:
         result = await self.session.execute(
             select(Game).where(Game.f95_id == thread_id)
         )
         return result.scalar_one_or_none()
 
+    async def get_games_by_ids(self, thread_ids: List[int]) -> Dict[int, Game]:
+        """
+        Load many games in one query. Returns {f95_id: Game} for the ids found.
+        """
+        if not thread_ids:
+            return {}
+        result = await self.session.execute(
+            select(Game).where(Game.f95_id.in_(thread_ids))
+        )
+        return {g.f95_id: g for g in result.scalars().all()}
+
     async def search_local(self, query: str) -> List[Game]:
         stmt = select(Game).where(Game.name.ilike(f"%{query}%"))
         result = await self.session.execute(stmt)
@@ -357,29 +469,7 @@ class GameService:
             stmt = stmt.where(Game.type_id.notin_(exclude_engine))
 
         if tags:
-            tag_conditions = []
-            for tag in tags:
-                # Precise tag matching for JSON array string "[...]"
-                # Handle Integer vs String tags in JSON
-                # If digit, assume stored as number [1, 2] -> Match 1
-                # If string, assume stored as string ["Tag"] -> Match "Tag"
-                if str(tag).isdigit():
-                    t_val = tag
-                else:
-                    # If it's a string, ensure it is quoted for JSON matching
-                    # Unless it's already quoted
-                    if str(tag).startswith('"') and str(tag).endswith('"'):
-                        t_val = tag
-                    else:
-                        t_val = f'"{tag}"'
-
-                cond = or_(
-                    Game.tags == f"[{t_val}]",
-                    Game.tags.like(f"[{t_val}, %"),
-                    Game.tags.like(f"%, {t_val}]"),
-                    Game.tags.like(f"%, {t_val}, %"),
-                )
-                tag_conditions.append(cond)
+            tag_conditions = [_tag_match(str(tag)) for tag in tags]
 
             if tag_conditions:
                 if tag_mode == "OR":
@@ -401,23 +491,7 @@ class GameService:
                             continue
 
                         # Build AND conditions for this group
-                        current_group_and = []
-                        for tag in group_tags:
-                            if str(tag).isdigit():
-                                t_val = tag
-                            else:
-                                if str(tag).startswith('"') and str(tag).endswith('"'):
-                                    t_val = tag
-                                else:
-                                    t_val = f'"{tag}"'
-
-                            cond = or_(
-                                Game.tags == f"[{t_val}]",
-                                Game.tags.like(f"[{t_val}, %"),
-                                Game.tags.like(f"%, {t_val}]"),
-                                Game.tags.like(f"%, {t_val}, %"),
-                            )
-                            current_group_and.append(cond)
+                        current_group_and = [_tag_match(str(tag)) for tag in group_tags]
 
                         if current_group_and:
                             group_conditions.append(and_(*current_group_and))
@@ -428,54 +502,19 @@ class GameService:
                 logger.warning("Failed to parse tag_groups parameters as JSON.")
 
         if exclude_tags:
-            for tag in exclude_tags:
-                # Exclude if it matches any of the precise patterns
-                # Handle NULLs safely (keep them if excluding a tag)
-                stmt = stmt.where(
-                    or_(
-                        Game.tags.is_(None),
-                        ~or_(
-                            Game.tags == f"[{tag}]",
-                            Game.tags.like(f"[{tag}, %"),
-                            Game.tags.like(f"%, {tag}]"),
-                            Game.tags.like(f"%, {tag}, %"),
-                        ),
+            # Games without tags have no game_tags rows, so they are kept
+            stmt = stmt.where(
+                Game.f95_id.notin_(
+                    select(GameTag.game_id).where(
+                        GameTag.tag.in_([_tag_value(str(t)) for t in exclude_tags])
                     )
                 )
+            )
 
         if updated_after:
             stmt = stmt.where(Game.f95_last_update >= updated_after)
 
-        # Sorting Logic
-        if sort_by == "name":
-            sort_col = Game.name
-        elif sort_by == "rating":
-            # Weighted Rating (Bayesian Average)
-            # WR = (v / (v+m)) * R + (m / (v+m)) * C
-            # v = likes (coalesce to 0)
-            # R = rating (coalesce to 0)
-            # m = settings.WEIGHTED_RATING_MIN_VOTES
-            # C = settings.WEIGHTED_RATING_GLOBAL_MEAN
-
-            m = settings.WEIGHTED_RATING_MIN_VOTES
-            C = settings.WEIGHTED_RATING_GLOBAL_MEAN
-
-            # Cast inputs to Float to avoid integer division issues
-            v = cast(coalesce(Game.likes, 0), Float)
-            R = cast(coalesce(Game.rating, 0), Float)
-
-            sort_col = (v / (v + m)) * R + (m / (v + m)) * C
-
-        elif sort_by == "updated_at":
-            sort_col = Game.f95_last_update
-        else:
-            # Default fallback
-            sort_col = Game.f95_last_update
-
-        if sort_dir == "asc":
-            stmt = stmt.order_by(sort_col.asc().nulls_last())
-        else:
-            stmt = stmt.order_by(sort_col.desc().nulls_last())
+        stmt = stmt.order_by(_sort_order(sort_by, sort_dir))
 
         # Enforce Pagination
         offset = (page - 1) * limit
@@ -541,6 +580,15 @@ class GameService:
             # Limit Remote Results based on requested limit
             remote_matches = remote_matches[:limit]
 
+            # Resolve all already-indexed matches in one query, not one per match
+            existing = await self.get_games_by_ids(
+                [
+                    int(data.get("thread_id") or data.get("id"))
+                    for data in remote_matches
+                    if data.get("thread_id") or data.get("id")
+                ]
+            )
+
             saved_games = []
             for data in remote_matches:
                 tid = data.get("thread_id") or data.get("id")
@@ -548,9 +596,10 @@ class GameService:
                     continue
                 tid = int(tid)
 
-                game = await self.get_game_by_id(tid)
+                game = existing.get(tid)
                 if not game:
                     game = Game(f95_id=tid, name=data.get("title") or "Unknown")
+                    existing[tid] = game
 
                 game.name = data.get("title") or game.name
                 game.creator = data.get("creator")
@@ -573,9 +622,9 @@ class GameService:
                     except (ValueError, TypeError):
                         pass
 
-                self.session.add(game)
                 saved_games.append(game)
 
+            self.session.add_all(saved_games)
             await self.session.commit()
 
             # --- Synchronous Enrichment for Remote Results ---
@@ -584,17 +633,16 @@ class GameService:
                 ids = [g.f95_id for g in saved_games]
                 ts_map = await self.checker_client.check_updates(ids)
 
+                # Fetch details
+                details_map = await self.checker_client.get_game_details_bulk(ts_map)
+
                 updates_count = 0
                 for game in saved_games:
                     ts = ts_map.get(game.f95_id)
-                    if ts:
-                        # Fetch details
-                        details = await self.checker_client.get_game_details(
-                            game.f95_id, ts
-                        )
-                        if details:
-                            self.update_game_with_checker_details(game, details, ts)
-                            updates_count += 1
+                    details = details_map.get(game.f95_id)
+                    if ts and details:
+                        self.update_game_with_checker_details(game, details, ts)
+                        updates_count += 1
 
                 if updates_count > 0:
                     await self.session.commit()
@@ -609,65 +657,89 @@ class GameService:
         """
         Scheduled job: Recent Updates.
         """
-        await self.f95_client.login()
-
+        # No explicit login: get_latest_updates logs in on first use, so an
+        # already logged-in (injected) client skips the login round-trip.
+        max_pages = 5
         page = 1
-        has_more = True
+        logger.info(f"Fetching Recent Updates Page {page}...")
+        next_fetch = asyncio.create_task(
+            self.f95_client.get_latest_updates(page=page, sort="date")
+        )
 
-        while has_more:
-            logger.info(f"Fetching Recent Updates Page {page}...")
-            updates = await self.f95_client.get_latest_updates(page=page, sort="date")
+        try:
+            while next_fetch:
+                updates = await next_fetch
+                next_fetch = None
 
-            if not updates:
-                break
+                if not updates:
+                    break
 
-            count = 0
-            for data in updates:
-                tid = data.get("thread_id")
-                if not tid:
-                    continue
-                tid = int(tid)
-
-                game = await self.get_game_by_id(tid)
-                if not game:
-                    game = Game(f95_id=tid, name=data.get("title") or "Unknown")
-
-                game.name = data.get("title") or game.name
-                game.version = data.get("version")
-                game.creator = data.get("creator")
+                # Prefetch the next page while this one is written to the DB
+                if page < max_pages:
+                    logger.info(f"Fetching Recent Updates Page {page + 1}...")
+                    next_fetch = asyncio.create_task(
+                        self.f95_client.get_latest_updates(page=page + 1, sort="date")
+                    )
 
-                game.cover_url = (
-                    data.get("cover_url")
-                    or data.get("featured_image")
-                    or data.get("image_url")
-                    or data.get("cover")
-                    or game.cover_url
+                # Resolve all already-indexed games on this page in one query
+                existing = await self.get_games_by_ids(
+                    [
+                        int(data["thread_id"])
+                        for data in updates
+                        if data.get("thread_id")
+                    ]
                 )
 
-                # Parse Date from F95Zone result
-                if data.get("ts"):
-                    try:
-                        game.f95_last_update = datetime.fromtimestamp(float(data["ts"]))
-                    except (ValueError, TypeError):
-                        pass
-                elif data.get("date"):
-                    try:
-                        game.f95_last_update = datetime.fromtimestamp(
-                            float(data["date"])
-                        )
-                    except (ValueError, TypeError):
-                        pass
+                count = 0
+                for data in updates:
+                    tid = data.get("thread_id")
+                    if not tid:
+                        continue
+                    tid = int(tid)
+
+                    game = existing.get(tid)
+                    if not game:
+                        game = Game(f95_id=tid, name=data.get("title") or "Unknown")
+                        existing[tid] = game
+
+                    game.name = data.get("title") or game.name
+                    game.version = data.get("version")
+                    game.creator = data.get("creator")
+
+                    game.cover_url = (
+                        data.get("cover_url")
+                        or data.get("featured_image")
+                        or data.get("image_url")
+                        or data.get("cover")
+                        or game.cover_url
+                    )
 
-                self.session.add(game)
-                count += 1
+                    # Parse Date from F95Zone result
+                    if data.get("ts"):
+                        try:
+                            game.f95_last_update = datetime.fromtimestamp(
+                                float(data["ts"])
+                            )
+                        except (ValueError, TypeError):
+                            pass
+                    elif data.get("date"):
+                        try:
+                            game.f95_last_update = datetime.fromtimestamp(
+                                float(data["date"])
+                            )
+                        except (ValueError, TypeError):
+                            pass
 
-            await self.session.commit()
-            logger.info(f"Upserted {count} games on page {page}.")
+                    count += 1
 
-            if page >= 5:
-                has_more = False
-            else:
+                self.session.add_all(existing.values())
+                await self.session.commit()
+                logger.info(f"Upserted {count} games on page {page}.")
                 page += 1
+        finally:
+            # Stopped early (empty page or error): drop the speculative fetch
+            if next_fetch:
+                next_fetch.cancel()
 
         # Trigger tracked sync after
         await self.sync_tracked_games()
@@ -6,17 +6,48 @@ from typing import List, Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
 
+# Compiled once at import; _parse_entry runs for every feed entry.
+TITLE_PATTERN = re.compile(r"^\[(?:UPDATE|NEW|GAME)\]\s(.*?)(?:\s\[([^\]]+)\])?$")
+AUTHOR_SUFFIX_PATTERN = re.compile(r"\s*<rss@f95>\s*", flags=re.IGNORECASE)
+THREAD_SLUG_ID_PATTERN = re.compile(r"\.(\d+)/?$")
+THREAD_PATH_ID_PATTERN = re.compile(r"threads/(\d+)(?:/|$)")
+
 
 class RSSClient:
     BASE_RSS_URL = "https://f95zone.to/sam/latest_alpha/latest_data.php"
 
-    def __init__(self):
-        # httpx client could be reused, but here we instantiate per request or could be passed in.
-        # For simplicity in this service-pattern, we'll create a new async client or use a context manager in the method.
-        # Ideally, we should share a client, but let's stick to making it work first.
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
+        # Persistent client, created on first use, so repeated fetches reuse
+        # the pooled connection instead of a new TCP+TLS handshake each call.
+        # An existing f95zone.to client can be passed in instead; the caller
+        # then owns closing it.
+        self._client: Optional[httpx.AsyncClient] = client
+        self._owns_client = client is None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=30.0,
+                # Transport-level retries for failed connects (no manual retry loop)
+                transport=httpx.AsyncHTTPTransport(verify=False, retries=3),
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None and self._owns_client:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
 
     async def get_games(
         self, limit: int = 60, search: str = None, tags: List[int] = None
@@ -36,12 +67,9 @@ class RSSClient:
                 query_params.append(("tags[]", str(t)))
 
         try:
-            async with httpx.AsyncClient(
-                headers=self.headers, verify=False, timeout=30.0
-            ) as client:
-                resp = await client.get(self.BASE_RSS_URL, params=query_params)
-                resp.raise_for_status()
-                content = resp.content
+            resp = await self.client.get(self.BASE_RSS_URL, params=query_params)
+            resp.raise_for_status()
+            content = resp.content
 
             # Feedparser is blocking/cpu-bound, so run in executor to be safe if feed is huge
             # But for RSS it's usually fast. Let's strictly follow async best practices.
@@ -67,19 +95,14 @@ class RSSClient:
             name = title_raw
             version = "Unknown"
 
-            match = re.match(
-                r"^\[(?:UPDATE|NEW|GAME)\]\s(.*?)(?:\s\[([^\]]+)\])?$",
-                title_raw.strip(),
-            )
+            match = TITLE_PATTERN.match(title_raw.strip())
             if match:
                 name = match.group(1).strip()
                 version = match.group(2).strip() if match.group(2) else "Unknown"
 
             # Author cleaning
             author_raw = entry.get("author", "")
-            author = re.sub(
-                r"\s*<rss@f95>\s*", "", author_raw, flags=re.IGNORECASE
-            ).strip()
+            author = AUTHOR_SUFFIX_PATTERN.sub("", author_raw).strip()
 
             # Thread ID extraction
             link = entry.get("link", "")
@@ -102,11 +125,11 @@ class RSSClient:
 
     def _extract_thread_id(self, url: str) -> Optional[int]:
         # Matches /threads/slug.12345/ or /threads/12345/
-        match = re.search(r"\.(\d+)/?$", url)
+        match = THREAD_SLUG_ID_PATTERN.search(url)
         if match:
             return int(match.group(1))
 
-        match = re.search(r"threads/(\d+)(?:/|$)", url)
+        match = THREAD_PATH_ID_PATTERN.search(url)
         if match:
             return int(match.group(1))
 
@@ -2,12 +2,16 @@ import logging
 import asyncio
 import json
 import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import Game
 from app.services.f95_client import F95ZoneClient
 from app.database import AsyncSessionLocal
 from sqlalchemy.future import select
 from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from app.services.f95checker_client import F95CheckerClient
 from app.services.game_service import GameService
 
@@ -19,7 +23,10 @@ STATE_FILE = settings.SEED_STATE_FILE
 
 
 class SeedService:
-    def __init__(self):
+    def __init__(self, sleep: Callable[[float], Awaitable[None]] = asyncio.sleep):
+        # All loop delays go through this, so callers can swap in a jittered
+        # or instant sleep without patching asyncio
+        self._sleep = sleep
         self.client = F95ZoneClient()
         self.checker_client = F95CheckerClient()
         self.page = 1
@@ -34,6 +41,7 @@ class SeedService:
         self.estimated_seconds_remaining = 0
         self.metric_error = None
         self.failed_ids = set()
+        self._saved_payload = None  # Last payload written by _save_state
         self._load_state()
 
     def _load_state(self):
@@ -59,24 +67,9 @@ class SeedService:
 
     async def _save_state(self):
         try:
-            # Ensure dir exists
-            from pathlib import Path
-
-            path = Path(STATE_FILE).resolve()
-            path.parent.mkdir(parents=True, exist_ok=True)
-
-            temp_path = path.with_suffix(".tmp")
-
-            # Atomic write: Write to temp -> Rename
-            # Use run_in_executor for file I/O to avoid blocking loop
-            await asyncio.to_thread(self._write_file_atomic, path, temp_path)
-
-        except Exception as e:
-            logger.error(f"Failed to save seed state: {e}")
-
-    def _write_file_atomic(self, path, temp_path):
-        with open(temp_path, "w") as f:
-            json.dump(
+            # Serialize up front: json.dump() issues one write() per token,
+            # a pre-built payload goes out in a single write.
+            payload = json.dumps(
                 {
                     "page": self.page,
                     "items_processed": self.items_processed,
@@ -86,9 +79,30 @@ class SeedService:
                     "last_run_completion_time": self.last_run_completion_time,
                     "pending_enrichment_count": self.pending_enrichment_count,
                     "estimated_seconds_remaining": self.estimated_seconds_remaining,
-                },
-                f,
-            )
+                }
+            ).encode("utf-8")
+
+            # Nothing changed since the last save: skip the file write
+            if payload == self._saved_payload:
+                return
+
+            # All file-system work (resolve, mkdir, write, rename) runs in a
+            # worker thread so it never blocks the event loop
+            await asyncio.to_thread(self._write_file_atomic, payload)
+            self._saved_payload = payload
+
+        except Exception as e:
+            logger.error(f"Failed to save seed state: {e}")
+
+    def _write_file_atomic(self, payload: bytes):
+        # Ensure dir exists
+        path = Path(STATE_FILE).resolve()
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Atomic write: Write to temp -> Rename
+        temp_path = path.with_suffix(".tmp")
+        with open(temp_path, "wb") as f:
+            f.write(payload)
         os.replace(temp_path, path)
 
     def get_status(self):
@@ -183,7 +197,7 @@ class SeedService:
                         f"Failed to fetch page {self.page}. Retrying in 60s..."
                     )
                     try:
-                        await asyncio.sleep(60)
+                        await self._sleep(60)
                     except asyncio.CancelledError:
                         break
                     continue
@@ -206,6 +220,7 @@ class SeedService:
                     count = 0
                     skipped_old = 0
                     stop_signal = False
+                    to_upsert = []
 
                     for data in games_data:
                         tid = data.get("thread_id")
@@ -239,13 +254,14 @@ class SeedService:
                                 skipped_old += 1
                                 continue
 
-                        await self._upsert_game_basic(session, data)
+                        to_upsert.append(data)
                         count += 1
 
                         # Update max_processed_id on the fly
                         if tid > self.max_processed_id:
                             self.max_processed_id = tid  # Update in memory immediately
 
+                    await self._upsert_games_basic(session, to_upsert)
                     await session.commit()
 
                 self.items_processed += count
@@ -260,7 +276,7 @@ class SeedService:
                 # 3. Pagination & Sleep
                 self.page += 1
                 await self._save_state()
-                await asyncio.sleep(settings.SEED_PAGE_DELAY)
+                await self._sleep(settings.SEED_PAGE_DELAY)
 
             # END OF LOOP
 
@@ -298,48 +314,73 @@ class SeedService:
         """
         Upsert Basic Info ONLY. Do not touch tags/status.
         """
-        tid = data.get("thread_id")
-        if not tid:
-            return
-
-        tid = int(tid)
-        game = await session.get(Game, tid)
-        if not game:
-            game = Game(f95_id=tid, name=data.get("title") or "Unknown")
-
-        # Update Basic Fields
-        game.name = data.get("title") or game.name
-        game.creator = data.get("creator") or game.creator
-        game.version = data.get("version")
-
-        # Cover URL from API
-        game.cover_url = (
-            data.get("cover_url")
-            or data.get("featured_image")
-            or data.get("image_url")
-            or data.get("cover")
-            or game.cover_url
-        )
+        await self._upsert_games_basic(session, [data])
 
-        # Date from F95Zone
-        if data.get("ts"):
-            try:
-                from datetime import datetime
+    async def _upsert_games_basic(self, session: AsyncSession, rows: List[dict]):
+        """
+        Upsert Basic Info ONLY for a page of API rows. Do not touch tags/status.
+        One INSERT ... ON CONFLICT DO UPDATE for the whole page; existing values
+        are kept (COALESCE) wherever the API row has nothing to offer.
+        """
+        now = datetime.now(timezone.utc)
+        values = []
+        for data in rows:
+            tid = data.get("thread_id")
+            if not tid:
+                continue
+
+            # Date from F95Zone
+            f95_last_update = None
+            if data.get("ts"):
+                try:
+                    f95_last_update = datetime.fromtimestamp(float(data["ts"]))
+                except (ValueError, TypeError):
+                    pass
+            elif data.get("date"):
+                try:
+                    f95_last_update = datetime.fromtimestamp(float(data["date"]))
+                except (ValueError, TypeError):
+                    pass
 
-                game.f95_last_update = datetime.fromtimestamp(float(data["ts"]))
-            except (ValueError, TypeError):
-                pass
-        elif data.get("date"):
-            try:
-                from datetime import datetime
+            values.append(
+                {
+                    "f95_id": int(tid),
+                    "name": data.get("title") or "Unknown",
+                    "creator": data.get("creator") or None,
+                    "version": data.get("version"),
+                    # Cover URL from API
+                    "cover_url": data.get("cover_url")
+                    or data.get("featured_image")
+                    or data.get("image_url")
+                    or data.get("cover")
+                    or None,
+                    "f95_last_update": f95_last_update,
+                    # Only used for new rows (not part of the update below)
+                    "tracked": False,
+                    "last_updated_at": now,
+                }
+            )
 
-                game.f95_last_update = datetime.fromtimestamp(float(data["date"]))
-            except (ValueError, TypeError):
-                pass
+        if not values:
+            return
 
         # We strictly avoid overwriting 'status' or 'tags' here.
-
-        session.add(game)
+        stmt = sqlite_insert(Game).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Game.f95_id],
+            set_={
+                "name": func.coalesce(
+                    func.nullif(stmt.excluded.name, "Unknown"), Game.name
+                ),
+                "creator": func.coalesce(stmt.excluded.creator, Game.creator),
+                "version": stmt.excluded.version,
+                "cover_url": func.coalesce(stmt.excluded.cover_url, Game.cover_url),
+                "f95_last_update": func.coalesce(
+                    stmt.excluded.f95_last_update, Game.f95_last_update
+                ),
+            },
+        )
+        await session.execute(stmt)
 
     async def enrichment_loop(self):
         """
@@ -350,23 +391,27 @@ class SeedService:
         # or should we count items processed IN TOTAL? Yes, let's keep adding to it.
         self.page = 1
         await self._save_state()
-        await self._save_state()
         logger.info("Starting Slow Enrichment Loop...")
 
         # Update initial pending count
         async with AsyncSessionLocal() as session:
             await self._update_pending_count(session)
 
+        # Keyset cursor: each batch starts after the last id handled, so games
+        # left unenriched on purpose (failed_ids) are never re-scanned this run.
+        last_seen_id = 0
+
         while True:
             if not self.is_running:
                 break
 
             async with AsyncSessionLocal() as session:
-                # 1. Fetch Candidates (Not enriched yet, and NOT in failed_ids)
+                # 1. Fetch Candidates (Not enriched yet, past the cursor)
                 stmt = (
                     select(Game)
                     .where(Game.last_enriched.is_(None))
-                    .where(Game.f95_id.notin_(self.failed_ids))
+                    .where(Game.f95_id > last_seen_id)
+                    .order_by(Game.f95_id)
                     .limit(10)
                 )
                 result = await session.execute(stmt)
@@ -399,10 +444,19 @@ class SeedService:
                 try:
                     timestamps_map = await self.checker_client.check_updates(ids)
 
-                    # 3. Full Details (Up to 10 API Calls)
+                    # 3. Full Details (Up to 10 API Calls, issued concurrently)
+                    details_map = await self.checker_client.get_game_details_bulk(
+                        timestamps_map
+                    )
+
                     # Use GameService to handle logic reuse
-                    game_service = GameService(session)
+                    game_service = GameService(
+                        session,
+                        f95_client=self.client,
+                        checker_client=self.checker_client,
+                    )
 
+                    enriched = []
                     for game in candidates:
                         if not self.is_running:
                             break
@@ -414,17 +468,10 @@ class SeedService:
                             # Verify if it really needs update?
                             # We are here because last_enriched is None, so yes.
 
-                            # Delay to be polite
-                            await asyncio.sleep(2)
-
                             try:
-                                details = await self.checker_client.get_game_details(
-                                    tid, ts
-                                )
+                                details = details_map.get(tid)
                                 if details:
-                                    game_service.update_game_with_checker_details(
-                                        game, details, ts
-                                    )
+                                    enriched.append((game, details, ts))
                                     logger.info(f"Enriched {tid} successfully.")
                                 else:
                                     # Handle Null/None response safely
@@ -443,8 +490,6 @@ class SeedService:
                                     logger.warning(
                                         f"Game {tid} returned 404 (Permanent). Marking as enriched."
                                     )
-                                    from datetime import datetime, timezone
-
                                     game.last_enriched = datetime.now(timezone.utc)
                                     session.add(game)
                                 else:
@@ -470,12 +515,13 @@ class SeedService:
 
                             # Mark as 'checked' effectively by setting last_enriched
                             # so we don't loop forever on it.
-                            from datetime import datetime, timezone
-
                             game.last_enriched = datetime.now(timezone.utc)
                             session.add(game)
 
+                    # One executemany UPDATE for the whole batch
+                    await game_service.update_games_with_checker_details_bulk(enriched)
                     await session.commit()
+                    last_seen_id = ids[-1]
 
                     # Update Progress & Metrics
                     self.items_processed += len(candidates)
@@ -492,7 +538,7 @@ class SeedService:
 
             # 4. Long Sleep between batches
             logger.info("Enrichment batch done. Sleeping 60 seconds...")
-            await asyncio.sleep(60)
+            await self._sleep(60)
 
     async def _update_pending_count(self, session: AsyncSession):
         """
@@ -506,11 +552,10 @@ class SeedService:
 
             self.pending_enrichment_count = count
 
-            # Estimate: (2s per game) + (60s overhead per batch of 10)
-            # Batch size = 10
-            # Time per batch = 10*2 + 60 = 80s
-            # Avg time per game = 8s
-            self.estimated_seconds_remaining = count * 8
+            # Estimate: 60s sleep per batch of 10 (details are fetched
+            # concurrently, so the requests themselves add little)
+            # Avg time per game = 6s
+            self.estimated_seconds_remaining = count * 6
 
             logger.info(
                 f"Updated Enrichment Metrics: Pending={self.pending_enrichment_count}, ETC={self.estimated_seconds_remaining}s"
@@ -0,0 +1,48 @@
+"""
+Run helper scripts from a single interpreter: ``python -m scripts <command>...``
+
+Chaining several commands (or ``all``) pays the interpreter start-up and the
+``app`` import once, and runs every command on the same event loop so the
+shared clients from ``scripts._clients`` are reused between them.
+"""
+
+import argparse
+import asyncio
+import importlib
+import sys
+
+# command -> (module, coroutine function)
+COMMANDS = {
+    "verify-api": ("scripts.verify_api", "main"),
+    "debug-enrichment": ("scripts.debug_enrichment", "check_enrichment_metrics"),
+}
+
+
+async def run(names):
+    for name in names:
+        module_name, func_name = COMMANDS[name]
+        module = importlib.import_module(module_name)
+        await getattr(module, func_name)()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m scripts", description="AVNCodex Indexer helper scripts"
+    )
+    parser.add_argument(
+        "commands",
+        nargs="+",
+        choices=[*COMMANDS, "all"],
+        help="Commands to run, in order ('all' runs every command)",
+    )
+    args = parser.parse_args(argv)
+
+    names = list(COMMANDS) if "all" in args.commands else args.commands
+
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(run(names))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Shared client accessors for the helper scripts.
+
+Every script used to build its own F95ZoneClient / F95CheckerClient, paying a
+fresh TCP+TLS handshake per client. These accessors hand out one instance per
+process so chained scripts reuse the same connection pool. The f95zone.to
+clients (F95Zone API + RSS) additionally share a single httpx.AsyncClient.
+"""
+
+import functools
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.services.f95_client import F95ZoneClient
+from app.services.f95checker_client import F95CheckerClient
+from app.services.rss_client import RSSClient
+
+_check_updates_cache: Dict[int, int] = {}
+
+
+@functools.lru_cache(maxsize=None)
+def f95zone_http() -> httpx.AsyncClient:
+    return F95ZoneClient.build_http_client()
+
+
+@functools.lru_cache(maxsize=None)
+def zone() -> F95ZoneClient:
+    return F95ZoneClient(client=f95zone_http())
+
+
+@functools.lru_cache(maxsize=None)
+def rss() -> RSSClient:
+    return RSSClient(client=f95zone_http())
+
+
+@functools.lru_cache(maxsize=None)
+def checker() -> F95CheckerClient:
+    return F95CheckerClient()
+
+
+async def check_updates(thread_ids: List[int]) -> Dict[int, int]:
+    """
+    Memoized F95CheckerClient.check_updates, cached per thread id.
+    Duplicate ids are collapsed and only ids not seen before hit the network.
+    Ids the API did not return are not cached so they can be retried.
+    """
+    missing = [
+        tid for tid in dict.fromkeys(thread_ids) if tid not in _check_updates_cache
+    ]
+    if missing:
+        _check_updates_cache.update(await checker().check_updates(missing))
+    return {
+        tid: _check_updates_cache[tid]
+        for tid in thread_ids
+        if tid in _check_updates_cache
+    }
+
+
+async def fetch_checker_details(
+    thread_ids: List[int],
+) -> Tuple[Dict[int, int], Dict[int, Optional[Dict[str, Any]]]]:
+    """
+    Fast check + full details in one pass.
+    The details requests for every id found by the fast check are issued
+    concurrently instead of one after another.
+    Returns (timestamps, {thread_id: details}).
+    """
+    timestamps = await check_updates(thread_ids)
+    details = await checker().get_game_details_bulk(timestamps)
+    return timestamps, details
+
+
+async def close_clients():
+    """
+    Close whichever shared clients were actually created.
+    """
+    zone.cache_clear()
+    rss.cache_clear()
+    if f95zone_http.cache_info().currsize:
+        await f95zone_http().aclose()
+        f95zone_http.cache_clear()
+    if checker.cache_info().currsize:
+        await checker().close()
+        checker.cache_clear()
@@ -0,0 +1,54 @@
+import asyncio
+import logging
+import os
+import sys
+
+# Add app to path
+sys.path.append(os.getcwd())
+
+from app.database import AsyncSessionLocal
+from app.models import Game
+from sqlalchemy.future import select
+from sqlalchemy import func
+
+# Configure Logging to console
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger("ENRICHMENT_DEBUG")
+
+
+async def _fetch_scalar(stmt):
+    async with AsyncSessionLocal() as session:
+        return await session.scalar(stmt)
+
+
+async def _fetch_all(stmt):
+    async with AsyncSessionLocal() as session:
+        # Materialize the whole result in one round-trip instead of row-by-row
+        return (await session.execute(stmt)).scalars().all()
+
+
+async def check_enrichment_metrics():
+    # The three reads are independent: give each its own session (and pooled
+    # connection) and run them concurrently.
+    total, pending, samples = await asyncio.gather(
+        # Check Total Games
+        _fetch_scalar(select(func.count(Game.f95_id))),
+        # Check Pending Enrichment
+        _fetch_scalar(
+            select(func.count(Game.f95_id)).where(Game.last_enriched.is_(None))
+        ),
+        # Check 5 sample games with last_enriched = None (ids only)
+        _fetch_all(select(Game.f95_id).where(Game.last_enriched.is_(None)).limit(5)),
+    )
+
+    logger.info("Total Games: %s", total)
+    logger.info("Pending Enrichment: %s", pending)
+    logger.info("Sample IDs: %s", samples)
+
+
+if __name__ == "__main__":
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(check_enrichment_metrics())
@@ -1,15 +1,12 @@
 import asyncio
 import logging
-import json
 import sys
 import os
 
 # Ensure app is in path
 sys.path.append(os.getcwd())
 
-from app.services.rss_client import RSSClient
-from app.services.f95_client import F95ZoneClient
-from app.services.f95checker_client import F95CheckerClient
+from scripts._clients import close_clients, fetch_checker_details, rss, zone
 
 # Configure Logging to console
 logging.basicConfig(
@@ -20,19 +17,19 @@ logger = logging.getLogger("VERIFIER")
 
 async def verify_rss():
     logger.info("--- 1. Testing RSSClient ---")
-    client = RSSClient()
+    client = rss()
     games = await client.get_games(limit=5)
 
     if games:
-        logger.info(f"✅ RSS Success. Fetched {len(games)} items.")
-        logger.info(f"Sample: {games[0]['name']} (ID: {games[0]['id']})")
+        logger.info("✅ RSS Success. Fetched %d items.", len(games))
+        logger.info("Sample: %s (ID: %s)", games[0]["name"], games[0]["id"])
     else:
         logger.error("❌ RSS Failed or Empty.")
 
 
 async def verify_f95zone():
     logger.info("\n--- 2. Testing F95ZoneClient ---")
-    client = F95ZoneClient()
+    client = zone()
 
     # Login
     logger.info("Attempting Login...")
@@ -46,20 +43,17 @@ async def verify_f95zone():
 
     # Search
     query = "Eternum"
-    logger.info(f"Searching for '{query}'...")
+    logger.info("Searching for '%s'...", query)
     results = await client.search_games(query)
     if results:
-        logger.info(f"✅ Search Success. Found {len(results)} matches.")
-        logger.info(f"Sample: {results[0]['title']} (ID: {results[0]['thread_id']})")
+        logger.info("✅ Search Success. Found %d matches.", len(results))
+        logger.info("Sample: %s (ID: %s)", results[0]["title"], results[0]["thread_id"])
     else:
         logger.error("❌ Search Failed or No Results.")
 
-    await client.close()
-
 
 async def verify_f95checker():
     logger.info("\n--- 3. Testing F95CheckerClient ---")
-    client = F95CheckerClient()
 
     # Known ID (Eternum usually has ID around these, let's allow dynamic if possible,
     # but for stable test let's use a known big game ID if we had one.
@@ -72,47 +66,52 @@ async def verify_f95checker():
     # ID: 15306 (Being a DIK) is a classic.
     test_ids = [15306]
 
-    logger.info(f"Checking updates for IDs: {test_ids}")
-    timestamps = await client.check_updates(test_ids)
+    logger.info("Checking updates for IDs: %s", test_ids)
+    timestamps, details_map = await fetch_checker_details(test_ids)
 
     if timestamps:
-        logger.info(f"✅ Fast Check Success. Results: {timestamps}")
-
-        tid = list(timestamps.keys())[0]
-        ts = timestamps[tid]
-
-        logger.info(f"Fetching full details for {tid}...")
-        details = await client.get_game_details(tid, ts)
-
-        if details:
-            logger.info("✅ Full Details Success.")
-            logger.info(f"Name: {details.get('name')}")
-            logger.info(f"Version: {details.get('version')}")
-            # Check for critical fields
-            if "downloads" in details:
-                logger.info(
-                    f"✅ Downloads field present ({len(details['downloads'])} platforms)."
-                )
+        logger.info("✅ Fast Check Success. Results: %s", timestamps)
+
+        for tid, details in details_map.items():
+            logger.info("Full details for %s...", tid)
+
+            if details:
+                logger.info("✅ Full Details Success.")
+                logger.info("Name: %s", details.get("name"))
+                logger.info("Version: %s", details.get("version"))
+                # Check for critical fields
+                if "downloads" in details:
+                    logger.info(
+                        "✅ Downloads field present (%d platforms).",
+                        len(details["downloads"]),
+                    )
+                else:
+                    logger.warning("⚠️ 'downloads' field missing!")
             else:
-                logger.warning("⚠️ 'downloads' field missing!")
-        else:
-            logger.error("❌ Full Details Failed.")
+                logger.error("❌ Full Details Failed.")
 
     else:
         logger.error("❌ Fast Check Failed (or game not found).")
 
-    await client.close()
-
 
 async def main():
     logger.info("STARTING REAL WORLD API VERIFICATION")
+    probes = (verify_rss, verify_f95zone, verify_f95checker)
     try:
-        await verify_rss()
-        await verify_f95zone()
-        await verify_f95checker()
-    except Exception as e:
-        logger.exception("CRITICAL FAILURE IN VERIFICATION SCRIPT")
+        # The three services are independent; overlap their round-trips and
+        # report a failing probe without aborting the others.
+        results = await asyncio.gather(
+            *(probe() for probe in probes), return_exceptions=True
+        )
+        for probe, result in zip(probes, results):
+            if isinstance(result, Exception):
+                logger.error(
+                    "CRITICAL FAILURE IN %s",
+                    probe.__name__,
+                    exc_info=result,
+                )
     finally:
+        await close_clients()
         logger.info("VERIFICATION COMPLETE")
 
 